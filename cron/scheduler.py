@@ -8,40 +8,65 @@ Usage:
     python scheduler.py              # Normal run
     python scheduler.py --dry-run    # Test without changes
     python scheduler.py --force      # Run outside schedule
+    python scheduler.py --loop       # Stay running, run every hour on schedule
 """
 
 import os
 import sys
 import asyncio
-import argparse
-from datetime import datetime
+import pickle
+from contextlib import nullcontext
+from datetime import datetime, timedelta
 from pathlib import Path
+from types import SimpleNamespace
 from zoneinfo import ZoneInfo
 
-import yaml
 from dotenv import load_dotenv
 
 # Add parent to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.automation import (
-    get_weather,
-    ask_ai_for_decision,
-    log_to_supabase,
-    get_history,
-    create_mcp_client,
-    get_room_conditions,
-    get_ac_status,
-    execute_action,
-)
-
 # Load .env from parent
 load_dotenv(dotenv_path=Path(__file__).parent.parent / ".env")
 
+# Local cache (weather forecast, decision history, parsed config)
+CACHE_DIR = Path(__file__).parent / ".cache"
+HISTORY_CACHE = CACHE_DIR / "history.json"
+
 # Load config
 CONFIG_PATH = Path(__file__).parent.parent / "config.yaml"
-with open(CONFIG_PATH) as f:
-    CONFIG = yaml.safe_load(f)
+CONFIG_CACHE = CACHE_DIR / "config.pkl"
+
+
+def load_config() -> dict:
+    """Load config.yaml, using a pickled copy while the YAML file is unchanged."""
+    st = CONFIG_PATH.stat()
+    source = (st.st_mtime_ns, st.st_size)
+    try:
+        with open(CONFIG_CACHE, "rb") as f:
+            cached_source, config = pickle.load(f)
+        # Exact match: an older config.yaml restored with its mtime must not hit
+        if cached_source == source:
+            return config
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+        pass
+
+    import yaml
+    with open(CONFIG_PATH) as f:
+        config = yaml.safe_load(f)
+
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(CONFIG_CACHE, "wb") as f:
+            pickle.dump((source, config), f)
+    except OSError:
+        pass
+    return config
+
+
+CONFIG = load_config()
+
+TZ = ZoneInfo(CONFIG["location"]["timezone"])
 
 # Environment
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY", "")
@@ -52,10 +77,9 @@ MCP_SERVER_URL = os.getenv("MCP_SERVER_URL", "")
 MCP_API_KEY = os.getenv("MCP_API_KEY", "")
 
 
-def is_within_schedule() -> bool:
+def is_within_schedule(now: datetime) -> bool:
     """Check if current time is within scheduled hours."""
-    tz = ZoneInfo(CONFIG["location"]["timezone"])
-    hour = datetime.now(tz).hour
+    hour = now.hour
     start = CONFIG["schedule"]["start_hour"]
     end = CONFIG["schedule"]["end_hour"]
 
@@ -64,109 +88,211 @@ def is_within_schedule() -> bool:
     return start <= hour < end
 
 
-def is_final_run() -> bool:
+def is_final_run(now: datetime) -> bool:
     """Check if this is the last run before wake up."""
-    tz = ZoneInfo(CONFIG["location"]["timezone"])
-    hour = datetime.now(tz).hour
     end = CONFIG["schedule"]["end_hour"]
-    return hour == end - 1
+    return now.hour == end - 1
 
 
-async def main():
-    parser = argparse.ArgumentParser(description="AC Night Automation")
-    parser.add_argument("--dry-run", action="store_true", help="Test without changes")
-    parser.add_argument("--force", action="store_true", help="Run outside schedule")
-    args = parser.parse_args()
+FLAGS = {"--dry-run", "--force", "--loop"}
+
+
+def parse_args(argv: list[str]) -> SimpleNamespace:
+    """Parse the --dry-run / --force / --loop flags."""
+    flags = set(argv)
+    if flags & {"-h", "--help"}:
+        print(__doc__)
+        sys.exit(0)
+    if not flags <= FLAGS:
+        print(f"Unknown arguments: {' '.join(sorted(flags - FLAGS))}")
+        print(__doc__)
+        sys.exit(2)
+    return SimpleNamespace(
+        dry_run="--dry-run" in flags,
+        force="--force" in flags,
+        loop="--loop" in flags,
+    )
 
-    tz = ZoneInfo(CONFIG["location"]["timezone"])
-    now = datetime.now(tz)
 
+def print_banner(now: datetime):
+    """Print the run header."""
     print(f"\n{'='*50}")
     print(f"AC Night Automation - {now.strftime('%Y-%m-%d %H:%M:%S %Z')}")
     print(f"{'='*50}")
 
+
+def seconds_until_next_hour(now: datetime) -> float:
+    """Seconds from now until the top of the next hour."""
+    next_hour = now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+    return (next_hour - now).total_seconds()
+
+
+def open_mcp_client():
+    """Create the MCP client (not yet entered)."""
+    # Heavy imports (fastmcp) are deferred until we know we'll run
+    from src.automation import create_mcp_client
+
+    return create_mcp_client(MCP_SERVER_URL, MCP_API_KEY)
+
+
+def open_http_clients() -> tuple:
+    """Create the pooled HTTP clients (not yet entered)."""
+    import httpx
+    from src.automation import create_supabase_client
+
+    # Pooled HTTP/2 clients: one shared (weather, OpenRouter), one for Supabase
+    http = httpx.AsyncClient(
+        http2=True,
+        timeout=30.0,
+        limits=httpx.Limits(max_keepalive_connections=10, max_connections=20),
+    )
+    supabase = create_supabase_client(SUPABASE_URL, SUPABASE_ANON_KEY)
+
+    return http, supabase
+
+
+async def run_once(args: SimpleNamespace, mcp_client, http, supabase, now: datetime):
+    """Gather data, decide and act for one scheduled hour."""
+    from src.automation import (
+        get_weather,
+        ask_ai_for_decision,
+        rule_based_decision,
+        log_to_supabase,
+        get_history,
+        get_conditions,
+        execute_action,
+    )
+
+    # Gather data (independent calls, run concurrently)
+    print("\n[2/3] Gathering room, AC, weather and history...")
+    results = await asyncio.gather(
+        get_conditions(mcp_client),
+        get_weather(
+            http, CONFIG["location"]["lat"], CONFIG["location"]["lon"], CACHE_DIR
+        ),
+        get_history(supabase, cache_file=HISTORY_CACHE),
+        return_exceptions=True,
+    )
+    conditions, weather, history = (
+        {"error": str(r)} if isinstance(r, Exception) else r for r in results
+    )
+    room, ac = (conditions, conditions) if isinstance(conditions, dict) else conditions
+    if isinstance(history, dict):
+        history = []
+
+    print(f"  Room: {room.get('temperature', '?')}°C, {room.get('humidity', '?')}%")
+    print(f"  AC: {ac.get('power', '?')}, {ac.get('temperature', '?')}°C")
+    print(f"  Outside: {weather.get('temperature', '?')}°C")
+
+    # Build context
+    context = {
+        "room_temp": room.get("temperature"),
+        "room_humidity": room.get("humidity"),
+        "outside_temp": weather.get("temperature"),
+        "outside_feels_like": weather.get("feels_like"),
+        "weather_desc": weather.get("description"),
+        "current_time": now.strftime("%H:%M"),
+        "ac_power": ac.get("power"),
+        "ac_temp": ac.get("temperature"),
+        "ac_mode": ac.get("mode"),
+        "history": history,
+    }
+
+    # Get decision
+    if is_final_run(now):
+        print("\n[3/3] Final run - turning off AC...")
+        decision = {"action": "turn_off", "reasoning": "Final run before wake up", "source": "schedule"}
+    elif decision := rule_based_decision(context, CONFIG.get("rules", {})):
+        print("\n[3/3] Rule matched - skipping AI...")
+    else:
+        print("\n[3/3] Asking AI for decision...")
+        decision = await ask_ai_for_decision(
+            http, OPENROUTER_API_KEY, OPENROUTER_MODEL, context, CONFIG
+        )
+        decision["source"] = "llm"
+
+    print(f"  Source: {decision['source']}")
+    print(f"  Action: {decision.get('action', 'none')}")
+    print(f"  Reasoning: {decision.get('reasoning', 'N/A')}")
+
+    # Execute
+    if decision.get("action") and decision["action"] != "none":
+        if args.dry_run:
+            print(f"\n  [DRY RUN] Would execute: {decision['action']}")
+            result = {"executed": False, "reason": "Dry run"}
+        else:
+            print(f"\nExecuting: {decision['action']}...")
+            result = await execute_action(mcp_client, decision, CONFIG)
+            print(f"  Result: {'Success' if result.get('executed') else result.get('reason')}")
+    else:
+        result = {"executed": False, "reason": "No action"}
+
+    # Log
+    if not args.dry_run:
+        await log_to_supabase(
+            supabase,
+            {
+                "room_temperature": room.get("temperature"),
+                "room_humidity": room.get("humidity"),
+                "outside_temperature": weather.get("temperature"),
+                "ac_power": ac.get("power"),
+                "ac_temperature": ac.get("temperature"),
+                "ac_mode": ac.get("mode"),
+                "action": decision.get("action", "none"),
+                "reasoning": decision.get("reasoning"),
+                "executed": result.get("executed", False),
+            },
+            cache_file=HISTORY_CACHE,
+        )
+        print("\nLogged to Supabase")
+
+
+async def loop(args: SimpleNamespace):
+    """Run every hour in one process, keeping the HTTP pools open between runs."""
+    http, supabase = open_http_clients()
+
+    async with http, supabase or nullcontext():
+        while True:
+            now = datetime.now(TZ)
+            if args.force or is_within_schedule(now):
+                print_banner(now)
+                try:
+                    # New MCP session each run, so a dropped session or a server
+                    # restart overnight doesn't break every later run
+                    async with open_mcp_client() as mcp_client:
+                        print(f"  Connected to {MCP_SERVER_URL}")
+                        await run_once(args, mcp_client, http, supabase, now)
+                except Exception as e:
+                    print(f"\nRun failed: {e}")
+
+                # stdout is block-buffered under cron/systemd; emit each run's log at once
+                sys.stdout.flush()
+
+            await asyncio.sleep(seconds_until_next_hour(datetime.now(TZ)))
+
+
+async def main():
+    args = parse_args(sys.argv[1:])
+    if args.loop:
+        await loop(args)
+        return
+
+    now = datetime.now(TZ)
+    print_banner(now)
+
     # Check schedule
-    if not args.force and not is_within_schedule():
+    if not args.force and not is_within_schedule(now):
         print(f"Outside scheduled hours. Use --force to run anyway.")
         return
 
     # Connect to MCP
-    print("\n[1/5] Connecting to MCP server...")
-    mcp_client = create_mcp_client(MCP_SERVER_URL, MCP_API_KEY)
+    print("\n[1/3] Connecting to MCP server...")
+    mcp_client = open_mcp_client()
+    http, supabase = open_http_clients()
 
-    async with mcp_client:
+    async with mcp_client, http, supabase or nullcontext():
         print(f"  Connected to {MCP_SERVER_URL}")
-
-        # Gather data
-        print("\n[2/5] Getting room conditions...")
-        room = await get_room_conditions(mcp_client)
-        print(f"  Room: {room.get('temperature', '?')}°C, {room.get('humidity', '?')}%")
-
-        print("\n[3/5] Getting AC status...")
-        ac = await get_ac_status(mcp_client)
-        print(f"  AC: {ac.get('power', '?')}, {ac.get('temperature', '?')}°C")
-
-        print("\n[4/5] Getting weather...")
-        weather = await get_weather(CONFIG["location"]["lat"], CONFIG["location"]["lon"])
-        print(f"  Outside: {weather.get('temperature', '?')}°C")
-
-        # Build context
-        context = {
-            "room_temp": room.get("temperature"),
-            "room_humidity": room.get("humidity"),
-            "outside_temp": weather.get("temperature"),
-            "outside_feels_like": weather.get("feels_like"),
-            "weather_desc": weather.get("description"),
-            "current_time": now.strftime("%H:%M"),
-            "ac_power": ac.get("power"),
-            "ac_temp": ac.get("temperature"),
-            "ac_mode": ac.get("mode"),
-            "history": await get_history(SUPABASE_URL, SUPABASE_ANON_KEY),
-        }
-
-        # Get decision
-        if is_final_run():
-            print("\n[5/5] Final run - turning off AC...")
-            decision = {"action": "turn_off", "reasoning": "Final run before wake up"}
-        else:
-            print("\n[5/5] Asking AI for decision...")
-            decision = await ask_ai_for_decision(
-                OPENROUTER_API_KEY, OPENROUTER_MODEL, context, CONFIG
-            )
-
-        print(f"  Action: {decision.get('action', 'none')}")
-        print(f"  Reasoning: {decision.get('reasoning', 'N/A')}")
-
-        # Execute
-        if decision.get("action") and decision["action"] != "none":
-            if args.dry_run:
-                print(f"\n  [DRY RUN] Would execute: {decision['action']}")
-                result = {"executed": False, "reason": "Dry run"}
-            else:
-                print(f"\nExecuting: {decision['action']}...")
-                result = await execute_action(mcp_client, decision, CONFIG)
-                print(f"  Result: {'Success' if result.get('executed') else result.get('reason')}")
-        else:
-            result = {"executed": False, "reason": "No action"}
-
-        # Log
-        if not args.dry_run:
-            await log_to_supabase(
-                SUPABASE_URL,
-                SUPABASE_ANON_KEY,
-                {
-                    "room_temperature": room.get("temperature"),
-                    "room_humidity": room.get("humidity"),
-                    "outside_temperature": weather.get("temperature"),
-                    "ac_power": ac.get("power"),
-                    "ac_temperature": ac.get("temperature"),
-                    "ac_mode": ac.get("mode"),
-                    "action": decision.get("action", "none"),
-                    "reasoning": decision.get("reasoning"),
-                    "executed": result.get("executed", False),
-                },
-            )
-            print("\nLogged to Supabase")
+        await run_once(args, mcp_client, http, supabase, now)
 
     print(f"\n{'='*50}")
     print("Done!")
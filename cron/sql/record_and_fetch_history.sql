@@ -0,0 +1,26 @@
+-- Insert one automation log row and return the latest history in a single call.
+-- Run once in the Supabase SQL editor; the scheduler falls back to a plain
+-- insert (and a separate history fetch next run) if this function is missing.
+
+create or replace function record_and_fetch_history(payload jsonb, history_limit int default 10)
+returns setof ac_automation_logs
+language plpgsql
+as $$
+begin
+  insert into ac_automation_logs (
+    room_temperature, room_humidity, outside_temperature,
+    ac_power, ac_temperature, ac_mode,
+    action, reasoning, executed
+  )
+  select
+    room_temperature, room_humidity, outside_temperature,
+    ac_power, ac_temperature, ac_mode,
+    action, reasoning, executed
+  from jsonb_populate_record(null::ac_automation_logs, payload);
+
+  return query
+    select * from ac_automation_logs
+    order by created_at desc
+    limit history_limit;
+end;
+$$;
@@ -6,6 +6,7 @@ Control your AC through SwitchBot Hub 2 using MCP.
 
 import os
 import sys
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastmcp import FastMCP
@@ -13,9 +14,7 @@ from fastmcp import FastMCP
 # Load .env file
 try:
     from dotenv import load_dotenv
-    env_file = Path(__file__).parent / ".env"
-    if env_file.exists():
-        load_dotenv(env_file)
+    load_dotenv(Path(__file__).parent / ".env")
 except ImportError:
     pass
 
@@ -28,7 +27,7 @@ SWITCHBOT_TOKEN = os.getenv("SWITCHBOT_TOKEN", "")
 SWITCHBOT_SECRET = os.getenv("SWITCHBOT_SECRET", "")
 AC_DEVICE_ID = os.getenv("SWITCHBOT_AC_DEVICE_ID", "")
 
-# Debug logging
+# Missing credentials are always reported; the rest only with SWITCHBOT_DEBUG=1
 if not SWITCHBOT_TOKEN:
     print("⚠️ WARNING: SWITCHBOT_TOKEN is empty!", file=sys.stderr)
 if not SWITCHBOT_SECRET:
@@ -36,15 +35,26 @@ if not SWITCHBOT_SECRET:
 if not AC_DEVICE_ID:
     print("⚠️ WARNING: SWITCHBOT_AC_DEVICE_ID is empty!", file=sys.stderr)
 
-if SWITCHBOT_TOKEN and SWITCHBOT_SECRET and AC_DEVICE_ID:
+if os.getenv("SWITCHBOT_DEBUG") == "1" and SWITCHBOT_TOKEN and SWITCHBOT_SECRET and AC_DEVICE_ID:
     print("✅ Environment variables loaded", file=sys.stderr)
     print(f"   Device ID: {AC_DEVICE_ID}", file=sys.stderr)
 
 # Initialize components
-mcp = FastMCP("SwitchBot AC Controller")
 client = SwitchBotClient(SWITCHBOT_TOKEN, SWITCHBOT_SECRET)
 ac = ACCommands(client, AC_DEVICE_ID)
 
+
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    """Close the pooled SwitchBot connections on shutdown."""
+    try:
+        yield
+    finally:
+        await client.aclose()
+
+
+mcp = FastMCP("SwitchBot AC Controller", lifespan=lifespan)
+
 # Register all tools
 register_ac_control_tools(mcp, ac)
 register_status_tools(mcp, ac)
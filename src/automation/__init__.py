@@ -1,15 +1,24 @@
 from .weather import get_weather
-from .ai_decision import ask_ai_for_decision
-from .logging import log_to_supabase, get_history
-from .mcp_client import create_mcp_client, get_room_conditions, get_ac_status, execute_action
+from .ai_decision import ask_ai_for_decision, rule_based_decision
+from .logging import create_supabase_client, log_to_supabase, get_history
+from .mcp_client import (
+    create_mcp_client,
+    get_room_conditions,
+    get_ac_status,
+    get_conditions,
+    execute_action,
+)
 
 __all__ = [
     "get_weather",
     "ask_ai_for_decision",
+    "rule_based_decision",
+    "create_supabase_client",
     "log_to_supabase",
     "get_history",
     "create_mcp_client",
     "get_room_conditions",
     "get_ac_status",
+    "get_conditions",
     "execute_action",
 ]
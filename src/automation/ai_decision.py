@@ -4,89 +4,193 @@ AI Decision Making
 Use OpenRouter to make AC decisions based on sleep science.
 """
 
-import json
+import re
+from datetime import datetime
+from functools import lru_cache
+
 import httpx
+import orjson
 
+from .retry import stream_with_retry
 
-async def ask_ai_for_decision(
-    api_key: str,
-    model: str,
-    context: dict,
-    config: dict,
-) -> dict:
-    """Ask AI for AC adjustment decision."""
-    if not api_key:
-        return {"error": "OPENROUTER_API_KEY not set", "action": "none"}
 
-    rules = config.get("rules", {})
-    ai_notes = config.get("ai", {}).get("notes", "")
-    room_layout = config.get("room", {}).get("layout", "")
+OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
 
-    # Get current month for season context
-    from datetime import datetime
-    current_month = datetime.now().month
-    season = "winter" if current_month in [12, 1, 2] else "spring" if current_month in [3, 4, 5] else "summer" if current_month in [6, 7, 8] else "autumn"
+# Markdown code fence around the AI's JSON (```json ... ```)
+FENCE_RE = re.compile(r"^```(?:json)?\s*(.*?)\s*```", re.DOTALL)
+
+# Actions execute_action understands
+ACTIONS = frozenset({"none", "turn_on", "turn_off", "adjust_temp", "change_mode"})
 
-    prompt = f"""You control a bedroom AC. Decide what's best for sleep.
+RESPONSE_FORMAT = """Respond with ONLY JSON:
+{"action": "none"|"turn_on"|"turn_off"|"adjust_temp"|"change_mode", "temperature": <number or null>, "mode": "cool"|"heat"|"auto"|"fan"|"dry"|null, "fan_speed": "auto"|"low"|"medium"|"high"|null, "reasoning": "<one short sentence>"}"""
 
+
+# Live readings; filled with str.format_map, missing fields read "unknown"
+DATA_TEMPLATE = """
 DATA:
-- Room sensor: {context.get('room_temp', 'unknown')}°C, {context.get('room_humidity', 'unknown')}% humidity
-- Outside: {context.get('outside_temp', 'unknown')}°C
-- Weather: {context.get('weather_desc', 'unknown')}
-- Season: {season} (month: {current_month})
-- Time: {context.get('current_time', 'unknown')}
-- Location: Israel
+- Room sensor: {room_temp}°C, {room_humidity}% humidity
+- Outside: {outside_temp}°C
+- Weather: {weather_desc}
+- Season: {season} (month: {month})
+- Time: {current_time}
 
 AC:
-- Power: {context.get('ac_power', 'unknown')}
-- Set to: {context.get('ac_temp', 'unknown')}°C, mode: {context.get('ac_mode', 'unknown')}
+- Power: {ac_power}
+- Set to: {ac_temp}°C, mode: {ac_mode}
+
+HISTORY: {history}
+
+"""
+
+
+async def _read_reply(response: httpx.Response) -> str:
+    """Collect a streamed reply, stopping as soon as its JSON object is complete."""
+    reply = ""
+    async for line in response.aiter_lines():
+        if not line.startswith("data: "):
+            continue  # Blank separators and ": keep-alive" comments
+        if line == "data: [DONE]":
+            break
+
+        choices = orjson.loads(line[6:]).get("choices")
+        delta = choices[0].get("delta", {}).get("content") if choices else None
+        if not delta:
+            continue
+        reply += delta
+
+        # The decision is one object; skip whatever the model would send after it
+        if "}" in delta:
+            start, end = reply.find("{"), reply.rfind("}") + 1
+            try:
+                orjson.loads(reply[start:end])
+                return reply[start:end]
+            except orjson.JSONDecodeError:
+                pass
+
+    return reply.strip()
+
+
+@lru_cache(maxsize=12)
+def _season(month: int) -> str:
+    """Season for a month (northern hemisphere)."""
+    if month in (12, 1, 2):
+        return "winter"
+    if month in (3, 4, 5):
+        return "spring"
+    if month in (6, 7, 8):
+        return "summer"
+    return "autumn"
+
+
+class _PromptFields(dict):
+    """Template values that default to "unknown"."""
+
+    def __missing__(self, key: str) -> str:
+        return "unknown"
+
+
+@lru_cache(maxsize=4)
+def _static_prompt(room_layout: str, ai_notes: str) -> str:
+    """Build the config-only part of the prompt (kept first for provider prompt caching)."""
+    return f"""You control a bedroom AC. Decide what's best for sleep.
 
 USER:
 - Sleeps with thick blanket (פוך)
 - Wakes ~06:30
+- Location: Israel
 
 ROOM LAYOUT:
 {room_layout}
 
 {ai_notes}
+"""
 
-HISTORY: {json.dumps(context.get('history', [])[:2], indent=2)}
 
-Respond with ONLY JSON:
-{{"action": "none"|"turn_on"|"turn_off"|"adjust_temp"|"change_mode", "temperature": <number or null>, "mode": "cool"|"heat"|"auto"|"fan"|"dry"|null, "fan_speed": "auto"|"low"|"medium"|"high"|null, "reasoning": "<brief>"}}"""
+def rule_based_decision(context: dict, rules: dict) -> dict | None:
+    """Decide without the AI when a configured hard rule applies, else None."""
+    checks = (
+        ("outside_temp", "turn_off_when_outside_below", "Outside"),
+        ("room_temp", "turn_off_when_room_below", "Room"),
+    )
+    for field, rule, label in checks:
+        limit = rules.get(rule)
+        value = context.get(field)
+        if limit is None or value is None or value >= limit:
+            continue
 
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://openrouter.ai/api/v1/chat/completions",
-                json={
-                    "model": model,
-                    "messages": [{"role": "user", "content": prompt}],
-                    "temperature": 0.3,
-                    "max_tokens": 200,
-                },
-                headers={
-                    "Authorization": f"Bearer {api_key}",
-                    "Content-Type": "application/json",
-                },
-                timeout=30.0,
-            )
+        # Unknown power (IR remotes often report none) still gets a turn-off
+        action = "none" if context.get("ac_power") == "off" else "turn_off"
+        return {
+            "action": action,
+            "reasoning": f"{label} {value}°C is below {limit}°C",
+            "source": "rule",
+        }
+
+    return None
+
+
+async def ask_ai_for_decision(
+    http: httpx.AsyncClient,
+    api_key: str,
+    model: str,
+    context: dict,
+    config: dict,
+) -> dict:
+    """Ask AI for AC adjustment decision."""
+    if not api_key:
+        return {"error": "OPENROUTER_API_KEY not set", "action": "none"}
+
+    ai_notes = config.get("ai", {}).get("notes", "")
+    room_layout = config.get("room", {}).get("layout", "")
 
+    # Get current month for season context
+    current_month = datetime.now().month
+
+    # Only what the model needs from the last log rows, not whole rows
+    hist = [
+        {"time": h.get("created_at", "")[:16], "action": h.get("action"), "room": h.get("room_temperature")}
+        for h in context.get("history", [])[:2]
+    ]
+
+    fields = _PromptFields(
+        context,
+        season=_season(current_month),
+        month=current_month,
+        history=orjson.dumps(hist).decode(),
+    )
+    prompt = _static_prompt(room_layout, ai_notes) + DATA_TEMPLATE.format_map(fields) + RESPONSE_FORMAT
+
+    try:
+        async with stream_with_retry(
+            http, "POST", OPENROUTER_URL,
+            content=orjson.dumps({
+                "model": model,
+                "messages": [{"role": "user", "content": prompt}],
+                "temperature": 0.3,
+                "max_tokens": 120,
+                "stream": True,
+            }),
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json",
+            },
+            timeout=30.0,
+        ) as response:
             if response.status_code != 200:
                 return {"error": f"API error: {response.status_code}", "action": "none"}
+            content = await _read_reply(response)
 
-            data = response.json()
-            content = data["choices"][0]["message"]["content"].strip()
-
-            # Parse JSON (handle markdown code blocks)
-            if content.startswith("```"):
-                content = content.split("```")[1]
-                if content.startswith("json"):
-                    content = content[4:]
+        # Parse JSON (handle markdown code blocks)
+        if m := FENCE_RE.match(content):
+            content = m.group(1)
 
-            return json.loads(content)
+        decision = orjson.loads(content)
+        if not isinstance(decision, dict) or decision.get("action") not in ACTIONS:
+            return {"error": f"Unexpected AI response: {content[:100]}", "action": "none"}
+        return decision
 
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         return {"error": f"Failed to parse AI response: {e}", "action": "none"}
     except Exception as e:
         return {"error": str(e), "action": "none"}
@@ -2,54 +2,121 @@
 Supabase Logging
 
 Log automation decisions and fetch history.
+
+When a cache file is given, logging goes through the record_and_fetch_history
+RPC (cron/sql/record_and_fetch_history.sql), which inserts the row and returns
+the latest history in one round trip. The rows are saved for the next run, so
+it doesn't need to fetch history separately.
 """
 
+import time
+from pathlib import Path
+
 import httpx
+import orjson
+
+from .retry import request_with_retry
+
+
+TABLE = "/rest/v1/ac_automation_logs"
+HISTORY_RPC = "/rest/v1/rpc/record_and_fetch_history"
 
+# Cached history is only trusted for a couple of hourly runs
+HISTORY_CACHE_MAX_AGE = 2 * 60 * 60  # seconds
 
-async def log_to_supabase(url: str, key: str, data: dict) -> bool:
-    """Log decision to Supabase."""
+
+def create_supabase_client(url: str, key: str) -> httpx.AsyncClient | None:
+    """Create an HTTP/2 client bound to Supabase, or None if not configured."""
     if not url or not key:
+        return None
+
+    return httpx.AsyncClient(
+        base_url=url,
+        http2=True,
+        headers={
+            "apikey": key,
+            "Authorization": f"Bearer {key}",
+        },
+        timeout=10.0,
+        limits=httpx.Limits(max_keepalive_connections=4),
+    )
+
+
+def _read_history_cache(cache_file: Path) -> list | None:
+    """Get history saved by the last logged run, if fresh."""
+    try:
+        if time.time() - cache_file.stat().st_mtime > HISTORY_CACHE_MAX_AGE:
+            return None
+        return orjson.loads(cache_file.read_bytes())
+    except (OSError, ValueError):
+        return None
+
+
+async def log_to_supabase(
+    supabase: httpx.AsyncClient | None,
+    data: dict,
+    cache_file: Path | None = None,
+) -> bool:
+    """Log decision to Supabase (and refresh the history cache if given)."""
+    if supabase is None:
         return False
 
+    headers = {"Content-Type": "application/json"}
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{url}/rest/v1/ac_automation_logs",
-                json=data,
-                headers={
-                    "apikey": key,
-                    "Authorization": f"Bearer {key}",
-                    "Content-Type": "application/json",
-                    "Prefer": "return=minimal",
-                },
+        if cache_file:
+            response = await request_with_retry(
+                supabase, "POST", HISTORY_RPC,
+                content=orjson.dumps({"payload": data}),
+                headers=headers,
             )
-            return response.status_code == 201
+            if response.status_code == 200:
+                try:
+                    cache_file.parent.mkdir(parents=True, exist_ok=True)
+                    cache_file.write_bytes(response.content)
+                except OSError:
+                    pass
+                return True
+            if response.status_code != 404:
+                return False
+
+            # RPC not installed: plain insert, and drop the now stale cache
+            cache_file.unlink(missing_ok=True)
+
+        response = await request_with_retry(
+            supabase, "POST", TABLE,
+            content=orjson.dumps(data),
+            headers={**headers, "Prefer": "return=minimal"},
+        )
+        return response.status_code == 201
     except Exception:
         return False
 
 
-async def get_history(url: str, key: str, limit: int = 10) -> list:
-    """Get recent decisions from Supabase."""
-    if not url or not key:
+async def get_history(
+    supabase: httpx.AsyncClient | None,
+    limit: int = 10,
+    cache_file: Path | None = None,
+) -> list:
+    """Get recent decisions from the history cache or Supabase."""
+    if cache_file:
+        cached = _read_history_cache(cache_file)
+        if cached is not None:
+            return cached[:limit]
+
+    if supabase is None:
         return []
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{url}/rest/v1/ac_automation_logs",
-                params={
-                    "select": "*",
-                    "order": "created_at.desc",
-                    "limit": str(limit),
-                },
-                headers={
-                    "apikey": key,
-                    "Authorization": f"Bearer {key}",
-                },
-            )
-            if response.status_code == 200:
-                return response.json()
-            return []
+        response = await request_with_retry(
+            supabase, "GET", TABLE,
+            params={
+                "select": "*",
+                "order": "created_at.desc",
+                "limit": str(limit),
+            },
+        )
+        if response.status_code == 200:
+            return orjson.loads(response.content)
+        return []
     except Exception:
         return []
@@ -2,11 +2,27 @@
 MCP Client Utilities
 
 Connect to MCP server and call tools.
+
+Status tools return structured content; the text parsers are only a
+fallback for servers that haven't been redeployed yet.
 """
 
+import asyncio
+import re
+
 from fastmcp import Client
 
 
+# Separates the AC and room sections of get_ac_and_room_status output
+SECTION_SEPARATOR = "-" * 40
+
+# Temperature and humidity lines of get_room_temperature output
+ROOM_RE = re.compile(r"Temperature:\s*(-?[\d.]+)\s*°C.*?Humidity:\s*([\d.]+)\s*%", re.DOTALL)
+
+# "Field: value" lines of get_ac_status output
+AC_FIELD_RE = re.compile(r"^(Power|Temperature|Mode|Fan Speed):\s*(.*?)\s*$", re.MULTILINE)
+
+
 def create_mcp_client(url: str, api_key: str) -> Client:
     """Create MCP client with API key auth."""
     if not api_key:
@@ -24,23 +40,62 @@ def create_mcp_client(url: str, api_key: str) -> Client:
     return Client(config)
 
 
-async def get_room_conditions(client: Client) -> dict:
-    """Get room temperature and humidity."""
+async def _call_tool(client: Client, name: str, arguments: dict | None = None):
+    """Call a tool and return the raw MCP result, skipping fastmcp's output parsing."""
+    result = await client.call_tool_mcp(name, arguments or {})
+    if result.isError:
+        raise RuntimeError(_tool_text(result))
+    return result
+
+
+def _tool_text(result) -> str:
+    """Get the text payload of a raw tool call result."""
+    return "\n".join(block.text for block in result.content if getattr(block, "text", None))
+
+
+def _tool_data(result) -> dict | None:
+    """Get the structured payload of a raw tool call result, if the server sent one."""
+    data = result.structuredContent
+    if not isinstance(data, dict) or set(data) == {"result"}:
+        return None  # No structured content, or a wrapped plain-text return
+    return data
+
+
+def _parse_room_conditions(text: str) -> dict:
+    """Parse room temperature and humidity from get_room_temperature output."""
+    m = ROOM_RE.search(text)
+    if m:
+        return {"temperature": float(m[1]), "humidity": float(m[2])}
+
+    return {"error": "Could not parse room conditions"}
+
+
+def _parse_ac_status(text: str) -> dict:
+    """Parse AC status from get_ac_status output."""
+    fields = dict(AC_FIELD_RE.findall(text))
+    status = {
+        "power": fields["Power"].lower() if "Power" in fields else None,
+        "temperature": None,
+        "mode": fields["Mode"].lower() if "Mode" in fields else None,
+        "fan_speed": fields["Fan Speed"].lower() if "Fan Speed" in fields else None,
+    }
+
     try:
-        result = await client.call_tool("get_room_temperature", {})
-        text = result.data if hasattr(result, "data") else str(result)
+        status["temperature"] = int(fields.get("Temperature", "").replace("°C", ""))
+    except ValueError:
+        pass
 
-        temp_match = text.find("Temperature:")
-        humid_match = text.find("Humidity:")
+    return status
 
-        if temp_match != -1 and humid_match != -1:
-            temp_line = text[temp_match:].split("\n")[0]
-            humid_line = text[humid_match:].split("\n")[0]
-            temperature = float(temp_line.split(":")[1].replace("°C", "").strip())
-            humidity = float(humid_line.split(":")[1].replace("%", "").strip())
-            return {"temperature": temperature, "humidity": humidity}
 
-        return {"error": "Could not parse room conditions"}
+async def get_room_conditions(client: Client) -> dict:
+    """Get room temperature and humidity."""
+    try:
+        result = await _call_tool(client, "get_room_temperature")
+        data = _tool_data(result)
+        if data is not None:
+            return data
+        return _parse_room_conditions(_tool_text(result))
     except Exception as e:
         return {"error": str(e)}
 
@@ -48,29 +103,36 @@ async def get_room_conditions(client: Client) -> dict:
 async def get_ac_status(client: Client) -> dict:
     """Get current AC status."""
     try:
-        result = await client.call_tool("get_ac_status", {})
-        text = result.data if hasattr(result, "data") else str(result)
-
-        status = {"power": "off", "temperature": None, "mode": None, "fan_speed": None}
-
-        for line in text.split("\n"):
-            if "Power:" in line:
-                status["power"] = "on" if "ON" in line.upper() else "off"
-            elif "Temperature:" in line:
-                try:
-                    status["temperature"] = int(line.split(":")[1].replace("°C", "").strip())
-                except ValueError:
-                    pass
-            elif "Mode:" in line:
-                status["mode"] = line.split(":")[1].strip().lower()
-            elif "Fan Speed:" in line:
-                status["fan_speed"] = line.split(":")[1].strip().lower()
-
-        return status
+        result = await _call_tool(client, "get_ac_status")
+        data = _tool_data(result)
+        if data is not None:
+            return data
+        return _parse_ac_status(_tool_text(result))
     except Exception as e:
         return {"error": str(e)}
 
 
+async def get_conditions(client: Client) -> tuple[dict, dict]:
+    """Get room conditions and AC status with a single tool call."""
+    try:
+        result = await _call_tool(client, "get_ac_and_room_status")
+    except Exception:
+        # Server without the combined tool (not redeployed yet): use the separate tools
+        room, ac = await asyncio.gather(get_room_conditions(client), get_ac_status(client))
+        return room, ac
+
+    data = _tool_data(result)
+    if data is not None:
+        return data.get("room", {}), data.get("ac", {})
+
+    ac_text, _, room_text = _tool_text(result).partition(SECTION_SEPARATOR)
+    try:
+        room = _parse_room_conditions(room_text)
+    except ValueError as e:
+        room = {"error": str(e)}
+    return room, _parse_ac_status(ac_text)
+
+
 async def execute_action(client: Client, decision: dict, config: dict) -> dict:
     """Execute AC action based on AI decision."""
     action = decision.get("action", "none")
@@ -82,9 +144,10 @@ async def execute_action(client: Client, decision: dict, config: dict) -> dict:
         default_mode = config.get("rules", {}).get("preferred_mode", "cool")
 
         if action == "turn_off":
-            result = await client.call_tool("turn_ac_off", {})
+            result = await _call_tool(client, "turn_ac_off")
         elif action in ("turn_on", "adjust_temp", "change_mode"):
-            result = await client.call_tool(
+            result = await _call_tool(
+                client,
                 "set_ac_all_settings",
                 {
                     "power": "off" if action == "turn_off" else "on",
@@ -96,7 +159,7 @@ async def execute_action(client: Client, decision: dict, config: dict) -> dict:
         else:
             return {"executed": False, "reason": f"Unknown action: {action}"}
 
-        result_str = result.data if hasattr(result, "data") else str(result)
+        result_str = _tool_text(result)
 
         if "✓" in result_str or "success" in result_str.lower():
             return {"executed": True, "result": result_str}
@@ -0,0 +1,84 @@
+"""
+HTTP Retry
+
+Bounded-concurrency requests with exponential backoff on transient errors.
+
+GETs are retried on any transport error or 429/5xx. Other methods (the
+Supabase insert, the OpenRouter completion) are only resent when the
+server can't have acted on them, so a retry never logs a row twice or
+bills a second completion.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import httpx
+
+
+# Cap concurrent outbound requests (gathered calls fan out at once)
+MAX_CONCURRENT = 4
+ATTEMPTS = 3
+BACKOFF = 0.5  # seconds, doubled per attempt
+
+_NET_SEM = asyncio.Semaphore(MAX_CONCURRENT)
+
+
+# Safe to resend whatever happened to the previous attempt
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+# Responses where the server declined the request without processing it
+NOT_PROCESSED = frozenset({429, 503})
+
+# Failures before the request reached the server
+NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+def _is_transient(method: str, status_code: int) -> bool:
+    """Whether this response is worth retrying for the method."""
+    if method.upper() in IDEMPOTENT_METHODS:
+        return status_code == 429 or status_code >= 500
+    return status_code in NOT_PROCESSED
+
+
+def _retryable_errors(method: str) -> tuple[type[Exception], ...]:
+    """Transport errors that are safe to retry for the method."""
+    if method.upper() in IDEMPOTENT_METHODS:
+        return (httpx.TransportError,)
+    return NOT_SENT_ERRORS
+
+
+async def request_with_retry(
+    client: httpx.AsyncClient, method: str, url: str, **kwargs
+) -> httpx.Response:
+    """Send a request, retrying transient failures (see module docstring) with backoff."""
+    retryable = _retryable_errors(method)
+    for attempt in range(ATTEMPTS):
+        last = attempt == ATTEMPTS - 1
+        try:
+            async with _NET_SEM:
+                response = await client.request(method, url, **kwargs)
+            if last or not _is_transient(method, response.status_code):
+                return response
+        except retryable:
+            if last:
+                raise
+        await asyncio.sleep(BACKOFF * 2 ** attempt)
+
+
+@asynccontextmanager
+async def stream_with_retry(client: httpx.AsyncClient, method: str, url: str, **kwargs):
+    """Open a streaming response, retrying like request_with_retry until the body is handed out."""
+    retryable = _retryable_errors(method)
+    for attempt in range(ATTEMPTS):
+        last = attempt == ATTEMPTS - 1
+        opened = False
+        try:
+            async with _NET_SEM, client.stream(method, url, **kwargs) as response:
+                if last or not _is_transient(method, response.status_code):
+                    opened = True
+                    yield response
+                    return
+        except retryable:
+            if opened or last:
+                raise
+        await asyncio.sleep(BACKOFF * 2 ** attempt)
@@ -4,7 +4,14 @@ Weather API
 Fetch weather data from Open-Meteo (free, no API key required).
 """
 
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
 import httpx
+import orjson
+
+from .retry import request_with_retry
 
 
 WEATHER_CODES = {
@@ -25,31 +32,91 @@ WEATHER_CODES = {
     96: "thunderstorm with hail",
 }
 
+# Serve hourly forecast from disk for this long before refetching
+CACHE_MAX_AGE = 3 * 60 * 60  # seconds
+
+
+def _cache_file(cache_dir: Path, now: datetime) -> Path:
+    """Forecast cache path for the given (UTC) day."""
+    return cache_dir / f"weather-{now:%Y%m%d}.json"
+
+
+def _read_cache(cache_dir: Path, lat: float, lon: float, now: datetime) -> dict | None:
+    """Get the current hour from a fresh cached forecast, if available."""
+    path = _cache_file(cache_dir, now)
+    try:
+        if time.time() - path.stat().st_mtime > CACHE_MAX_AGE:
+            return None
+        cached = orjson.loads(path.read_bytes())
+    except (OSError, ValueError):
+        return None
+
+    if cached.get("lat") != lat or cached.get("lon") != lon:
+        return None
+
+    hourly = cached.get("forecast", {}).get("hourly", {})
+    try:
+        i = hourly["time"].index(now.strftime("%Y-%m-%dT%H:00"))
+        return {
+            "temperature": hourly["temperature_2m"][i],
+            "feels_like": hourly["apparent_temperature"][i],
+            "humidity": hourly["relative_humidity_2m"][i],
+            "description": WEATHER_CODES.get(hourly["weather_code"][i], "unknown"),
+        }
+    except (KeyError, IndexError, ValueError):
+        return None
+
+
+def _write_cache(cache_dir: Path, lat: float, lon: float, now: datetime, data: dict):
+    """Persist the forecast response; cache failures are non-fatal."""
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        _cache_file(cache_dir, now).write_bytes(
+            orjson.dumps({"lat": lat, "lon": lon, "forecast": data})
+        )
+    except OSError:
+        pass
+
+
+async def get_weather(
+    http: httpx.AsyncClient,
+    lat: float,
+    lon: float,
+    cache_dir: Path | None = None,
+) -> dict:
+    """Get current weather from Open-Meteo, using the hourly cache when fresh."""
+    now = datetime.now(timezone.utc)
+    if cache_dir:
+        cached = _read_cache(cache_dir, lat, lon, now)
+        if cached:
+            return cached
 
-async def get_weather(lat: float, lon: float) -> dict:
-    """Get current weather from Open-Meteo."""
     url = (
         f"https://api.open-meteo.com/v1/forecast"
         f"?latitude={lat}&longitude={lon}"
         f"&current=temperature_2m,relative_humidity_2m,apparent_temperature,weather_code"
+        f"&hourly=temperature_2m,apparent_temperature,relative_humidity_2m,weather_code"
+        f"&forecast_days=1&timezone=GMT"
     )
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url)
-            data = response.json()
-
-            if response.status_code != 200:
-                return {"error": data.get("reason", "Weather API error")}
-
-            current = data.get("current", {})
-            code = current.get("weather_code", 0)
-
-            return {
-                "temperature": current.get("temperature_2m"),
-                "feels_like": current.get("apparent_temperature"),
-                "humidity": current.get("relative_humidity_2m"),
-                "description": WEATHER_CODES.get(code, "unknown"),
-            }
+        response = await request_with_retry(http, "GET", url)
+        data = orjson.loads(response.content)
+
+        if response.status_code != 200:
+            return {"error": data.get("reason", "Weather API error")}
+
+        if cache_dir:
+            _write_cache(cache_dir, lat, lon, now, data)
+
+        current = data.get("current", {})
+        code = current.get("weather_code", 0)
+
+        return {
+            "temperature": current.get("temperature_2m"),
+            "feels_like": current.get("apparent_temperature"),
+            "humidity": current.get("relative_humidity_2m"),
+            "description": WEATHER_CODES.get(code, "unknown"),
+        }
     except Exception as e:
         return {"error": str(e)}
@@ -7,13 +7,32 @@ Handles authentication and requests to the SwitchBot API.
 import hashlib
 import hmac
 import base64
+import os
 import time
-import uuid
+from functools import lru_cache
+
 import httpx
+import orjson
 
 
 API_BASE = "https://api.switch-bot.com/v1.1"
 
+# How long a successful authenticated call vouches for the credentials
+CREDENTIALS_TTL = 10 * 60  # seconds
+
+# Registered IR remotes change at human speed; serve repeat listings from memory
+DEVICES_TTL = 5 * 60  # seconds
+
+
+@lru_cache(maxsize=64)
+def _command_body(command: str, parameter: str) -> bytes:
+    """Encoded command payload (the same few commands repeat, so cache them)."""
+    return orjson.dumps({
+        "command": command,
+        "parameter": parameter,
+        "commandType": "command",
+    })
+
 
 class SwitchBotClient:
     """Async client for SwitchBot API."""
@@ -21,51 +40,98 @@ class SwitchBotClient:
     def __init__(self, token: str, secret: str):
         self.token = token
         self.secret = secret
+        # Pre-keyed HMAC, copied per request to skip key setup
+        self._hmac = hmac.new(secret.encode("utf-8"), digestmod=hashlib.sha256)
+        self._token_bytes = token.encode("utf-8")
+        self._base_headers = {
+            "Authorization": token,
+            "Content-Type": "application/json",
+        }
+        self._http: httpx.AsyncClient | None = None
+        self._auth_ok_at: float | None = None
+        self._devices: tuple[float, dict] | None = None
+
+    def _get_http(self) -> httpx.AsyncClient:
+        """Get the pooled HTTP client, creating it on first use."""
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                base_url=API_BASE,
+                http2=True,
+                timeout=30.0,
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+            )
+        return self._http
+
+    async def aclose(self):
+        """Close pooled connections."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    def credentials_recently_verified(self) -> bool:
+        """Whether the API accepted these credentials within CREDENTIALS_TTL."""
+        return (
+            self._auth_ok_at is not None
+            and time.monotonic() - self._auth_ok_at < CREDENTIALS_TTL
+        )
+
+    def cached_devices(self) -> dict | None:
+        """Last successful /devices response, if younger than DEVICES_TTL."""
+        if self._devices and time.monotonic() - self._devices[0] < DEVICES_TTL:
+            return self._devices[1]
+        return None
 
     def _generate_sign(self, nonce: str) -> tuple[str, str]:
         """Generate authentication signature."""
-        t = int(round(time.time() * 1000))
-        string_to_sign = f"{self.token}{t}{nonce}"
-        sign = base64.b64encode(
-            hmac.new(
-                self.secret.encode("utf-8"),
-                msg=string_to_sign.encode("utf-8"),
-                digestmod=hashlib.sha256,
-            ).digest()
-        )
-        return str(t), sign.decode("utf-8")
+        t = str(int(time.time() * 1000))
+        h = self._hmac.copy()
+        h.update(self._token_bytes)
+        h.update(t.encode("utf-8"))
+        h.update(nonce.encode("utf-8"))
+        return t, base64.b64encode(h.digest()).decode("utf-8")
 
     def _get_headers(self) -> dict:
         """Get authenticated headers for API request."""
-        nonce = uuid.uuid4().hex
+        nonce = os.urandom(16).hex()
         t, sign = self._generate_sign(nonce)
-        return {
-            "Authorization": self.token,
-            "sign": sign,
-            "nonce": nonce,
-            "t": t,
-            "Content-Type": "application/json",
-        }
+        return self._base_headers | {"sign": sign, "nonce": nonce, "t": t}
 
-    async def request(self, method: str, endpoint: str, data: dict = None) -> dict:
-        """Make authenticated request to SwitchBot API."""
-        url = f"{API_BASE}{endpoint}"
+    async def request(
+        self, method: str, endpoint: str, data: dict = None, content: bytes = None
+    ) -> dict:
+        """Make authenticated request to SwitchBot API (JSON data or pre-encoded content)."""
         headers = self._get_headers()
+        http = self._get_http()
+
+        if method.upper() == "GET":
+            response = await http.get(endpoint, headers=headers)
+        elif method.upper() == "POST":
+            if content is None:
+                content = orjson.dumps(data)
+            response = await http.post(endpoint, headers=headers, content=content)
+        else:
+            raise ValueError(f"Unsupported HTTP method: {method}")
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            if method.upper() == "GET":
-                response = await client.get(url, headers=headers)
-            elif method.upper() == "POST":
-                response = await client.post(url, headers=headers, json=data)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
+        if response.status_code == 401:
+            self._auth_ok_at = None
+            self._devices = None
+        if response.status_code >= 500:
+            response.raise_for_status()
 
-        response.raise_for_status()
-        return response.json()
+        # SwitchBot reports errors in the JSON body; callers check statusCode
+        try:
+            return orjson.loads(response.content)
+        except orjson.JSONDecodeError:
+            response.raise_for_status()
+            raise
 
     async def get_devices(self) -> dict:
         """Get all devices including infrared remotes."""
-        return await self.request("GET", "/devices")
+        result = await self.request("GET", "/devices")
+        if result.get("statusCode") == 100:
+            self._auth_ok_at = time.monotonic()
+            self._devices = (self._auth_ok_at, result)
+        return result
 
     async def get_device_status(self, device_id: str) -> dict:
         """Get status of a specific device."""
@@ -73,9 +139,8 @@ class SwitchBotClient:
 
     async def send_command(self, device_id: str, command: str, parameter: str = "default") -> dict:
         """Send command to a device."""
-        data = {
-            "command": command,
-            "parameter": parameter,
-            "commandType": "command",
-        }
-        return await self.request("POST", f"/devices/{device_id}/commands", data)
+        return await self.request(
+            "POST",
+            f"/devices/{device_id}/commands",
+            content=_command_body(command, parameter),
+        )
@@ -4,27 +4,60 @@ AC Commands
 High-level commands for controlling air conditioners via SwitchBot.
 """
 
+import time
 from typing import Literal
 from .client import SwitchBotClient
 
 
+# How long the last known settings are trusted for partial updates
+STATE_TTL = 5 * 60  # seconds
+
+# Settings a partial update needs to resend with setAll
+SETTINGS_KEYS = ("temperature", "mode", "fanSpeed")
+
+
 class ACCommands:
     """AC-specific commands using SwitchBot client."""
 
     def __init__(self, client: SwitchBotClient, device_id: str):
         self.client = client
         self.device_id = device_id
+        self._state: dict | None = None
+        self._state_at = 0.0
+        self._hub_id: str | None = None
+
+    def _state_fresh(self) -> bool:
+        """Whether the remembered settings are within STATE_TTL."""
+        return self._state is not None and time.monotonic() - self._state_at < STATE_TTL
+
+    def _remember(self, **state):
+        """Record settings known to be on the AC (expired settings aren't carried over)."""
+        self._state = {**(self._state if self._state_fresh() else {}), **state}
+        self._state_at = time.monotonic()
 
     async def get_status(self) -> dict:
         """Get AC status (power, temp, mode, fan)."""
         result = await self.client.get_device_status(self.device_id)
         if result.get("statusCode") != 100:
             raise Exception(result.get("message", "Failed to get status"))
-        return result.get("body", {})
+        body = result.get("body", {})
+        self._remember(**{
+            key: body[key] for key in ("power", "temperature", "mode", "fanSpeed") if key in body
+        })
+        return body
+
+    async def get_settings(self) -> dict:
+        """Get AC settings, from the last command/status if recent enough."""
+        if self._state_fresh() and all(key in self._state for key in SETTINGS_KEYS):
+            return self._state
+        return await self.get_status()
 
     async def turn_off(self) -> dict:
         """Turn off the AC."""
-        return await self.client.send_command(self.device_id, "turnOff")
+        result = await self.client.send_command(self.device_id, "turnOff")
+        if result.get("statusCode") == 100:
+            self._remember(power="off")
+        return result
 
     async def set_all(
         self,
@@ -38,32 +71,43 @@ class ACCommands:
             return await self.turn_off()
 
         parameter = f"{temperature},{mode},{fan_speed},{power}"
-        return await self.client.send_command(self.device_id, "setAll", parameter)
+        result = await self.client.send_command(self.device_id, "setAll", parameter)
+        if result.get("statusCode") == 100:
+            self._remember(power=power, temperature=temperature, mode=mode, fanSpeed=fan_speed)
+        return result
 
     async def send_custom(self, command: str, parameter: str = "default") -> dict:
         """Send custom command (swing, turbo, sleep, etc.)."""
+        # Effect on settings is unknown, so the next partial update re-reads status
+        self._state = None
         return await self.client.send_command(self.device_id, command, parameter)
 
-    async def get_hub_temperature(self) -> dict | None:
-        """Get room temperature from Hub 2 sensor."""
-        # First find the hub ID from the device list
+    async def _find_hub_id(self) -> str | None:
+        """Look up which hub controls this AC from the device list."""
         devices = await self.client.get_devices()
         if devices.get("statusCode") != 100:
             return None
 
         infrared_list = devices.get("body", {}).get("infraredRemoteList", [])
-        hub_id = None
         for device in infrared_list:
             if device.get("deviceId") == self.device_id:
-                hub_id = device.get("hubDeviceId")
-                break
+                return device.get("hubDeviceId")
+        return None
 
-        if not hub_id:
-            return None
+    async def get_hub_temperature(self) -> dict | None:
+        """Get room temperature from Hub 2 sensor."""
+        # The hub for an AC doesn't change, so look it up once
+        cached = self._hub_id is not None
+        if not cached:
+            self._hub_id = await self._find_hub_id()
+            if not self._hub_id:
+                return None
 
-        hub_status = await self.client.get_device_status(hub_id)
+        hub_status = await self.client.get_device_status(self._hub_id)
         if hub_status.get("statusCode") != 100:
-            return None
+            # Cached hub may be stale (remote moved to another hub): look it up again
+            self._hub_id = None
+            return await self.get_hub_temperature() if cached else None
 
         body = hub_status.get("body", {})
         return {
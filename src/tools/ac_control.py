@@ -10,6 +10,22 @@ from ..switchbot import ACCommands
 from .auth import require_auth
 
 
+TEMP_RANGE = range(16, 31)
+MODES = frozenset({"auto", "cool", "dry", "fan", "heat"})
+FAN_SPEEDS = frozenset({"auto", "low", "medium", "high"})
+
+
+def validate_settings(temperature: int = None, mode: str = None, fan_speed: str = None) -> str | None:
+    """Check settings at runtime (Literal hints aren't enforced); return an error or None."""
+    if temperature is not None and temperature not in TEMP_RANGE:
+        return "Error: Temperature must be between 16 and 30°C"
+    if mode is not None and mode not in MODES:
+        return f"Error: Mode must be one of {', '.join(sorted(MODES))}"
+    if fan_speed is not None and fan_speed not in FAN_SPEEDS:
+        return f"Error: Fan speed must be one of {', '.join(sorted(FAN_SPEEDS))}"
+    return None
+
+
 def register_ac_control_tools(mcp: FastMCP, ac: ACCommands):
     """Register AC control tools with the MCP server."""
 
@@ -21,8 +37,8 @@ def register_ac_control_tools(mcp: FastMCP, ac: ACCommands):
     ) -> str:
         """Turn on the AC with specified settings."""
         require_auth()
-        if not 16 <= temperature <= 30:
-            return "Error: Temperature must be between 16 and 30°C"
+        if error := validate_settings(temperature, mode, fan_speed):
+            return error
 
         result = await ac.set_all("on", temperature, mode, fan_speed)
         if result.get("statusCode") != 100:
@@ -43,10 +59,10 @@ def register_ac_control_tools(mcp: FastMCP, ac: ACCommands):
     async def set_ac_temperature(temperature: int) -> str:
         """Change AC temperature (AC must be on)."""
         require_auth()
-        if not 16 <= temperature <= 30:
-            return "Error: Temperature must be between 16 and 30°C"
+        if error := validate_settings(temperature=temperature):
+            return error
 
-        status = await ac.get_status()
+        status = await ac.get_settings()
         mode = status.get("mode", "cool")
         fan = status.get("fanSpeed", "auto")
 
@@ -59,7 +75,9 @@ def register_ac_control_tools(mcp: FastMCP, ac: ACCommands):
     async def set_ac_mode(mode: Literal["auto", "cool", "dry", "fan", "heat"]) -> str:
         """Change AC mode (AC must be on)."""
         require_auth()
-        status = await ac.get_status()
+        if error := validate_settings(mode=mode):
+            return error
+        status = await ac.get_settings()
         temp = status.get("temperature", 24)
         fan = status.get("fanSpeed", "auto")
 
@@ -72,7 +90,9 @@ def register_ac_control_tools(mcp: FastMCP, ac: ACCommands):
     async def set_ac_fan_speed(fan_speed: Literal["auto", "low", "medium", "high"]) -> str:
         """Change AC fan speed (AC must be on)."""
         require_auth()
-        status = await ac.get_status()
+        if error := validate_settings(fan_speed=fan_speed):
+            return error
+        status = await ac.get_settings()
         temp = status.get("temperature", 24)
         mode = status.get("mode", "cool")
 
@@ -90,8 +110,8 @@ def register_ac_control_tools(mcp: FastMCP, ac: ACCommands):
     ) -> str:
         """Set all AC settings at once."""
         require_auth()
-        if power == "on" and not 16 <= temperature <= 30:
-            return "Error: Temperature must be between 16 and 30°C"
+        if power == "on" and (error := validate_settings(temperature, mode, fan_speed)):
+            return error
 
         result = await ac.set_all(power, temperature, mode, fan_speed)
         if result.get("statusCode") != 100:
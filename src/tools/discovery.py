@@ -4,11 +4,54 @@ Discovery Tools
 MCP tools for discovering devices and checking credentials.
 """
 
+import asyncio
+
 from fastmcp import FastMCP
 from ..switchbot import SwitchBotClient
 from .auth import require_auth
 
 
+DEVICE_SEPARATOR = "-" * 40
+
+COMMON_COMMANDS_TEXT = """🎮 Common AC Commands:
+
+Standard:
+  • turnOn / turnOff - Power control
+  • setAll - Set all parameters
+
+Custom (use with send_custom_ac_command):
+  • swing - Toggle vertical swing
+  • swingHorizontal - Toggle horizontal swing
+  • timer - Set timer
+  • sleep - Activate sleep mode
+  • turbo - Activate turbo mode
+  • economy - Energy saving mode
+  • quiet - Silent mode
+  • light - Toggle display light
+
+⚠️ Not all commands work with all AC models."""
+
+
+def describe_result(result: dict | Exception, ok: str, failed: str) -> str:
+    """One status line for an API call result."""
+    if isinstance(result, Exception):
+        return f"❌ API request failed: {result}"
+    if result.get("statusCode") == 100:
+        return f"✅ {ok}"
+    return f"❌ {failed}: {result.get('message')}"
+
+
+def format_device(dev: dict) -> str:
+    """Format one infrared device for get_ac_devices."""
+    return (
+        f"Name: {dev.get('deviceName', 'Unnamed')}\n"
+        f"Type: {dev.get('remoteType', 'Unknown')}\n"
+        f"Device ID: {dev.get('deviceId', 'N/A')}\n"
+        f"Hub ID: {dev.get('hubDeviceId', 'N/A')}\n"
+        f"{DEVICE_SEPARATOR}\n"
+    )
+
+
 def register_discovery_tools(mcp: FastMCP, client: SwitchBotClient, device_id: str):
     """Register discovery tools with the MCP server."""
 
@@ -16,61 +59,58 @@ def register_discovery_tools(mcp: FastMCP, client: SwitchBotClient, device_id: s
     async def check_credentials() -> str:
         """Check if SwitchBot credentials are configured and valid."""
         require_auth()
-        output = "🔐 Credential Status Check:\n\n"
+        lines = ["🔐 Credential Status Check:", ""]
 
         if not client.token:
-            output += "❌ SWITCHBOT_TOKEN: Not set\n"
+            lines.append("❌ SWITCHBOT_TOKEN: Not set")
         else:
-            output += f"✅ SWITCHBOT_TOKEN: Set ({len(client.token)} chars)\n"
+            lines.append(f"✅ SWITCHBOT_TOKEN: Set ({len(client.token)} chars)")
 
         if not client.secret:
-            output += "❌ SWITCHBOT_SECRET: Not set\n"
+            lines.append("❌ SWITCHBOT_SECRET: Not set")
         else:
-            output += f"✅ SWITCHBOT_SECRET: Set ({len(client.secret)} chars)\n"
+            lines.append(f"✅ SWITCHBOT_SECRET: Set ({len(client.secret)} chars)")
 
         if not device_id:
-            output += "❌ SWITCHBOT_AC_DEVICE_ID: Not set\n"
+            lines.append("❌ SWITCHBOT_AC_DEVICE_ID: Not set")
         else:
-            output += f"✅ SWITCHBOT_AC_DEVICE_ID: {device_id}\n"
+            lines.append(f"✅ SWITCHBOT_AC_DEVICE_ID: {device_id}")
 
         if not (client.token and client.secret):
-            output += "\n⚠️ Missing credentials!"
-            return output
+            lines += ["", "⚠️ Missing credentials!"]
+            return "\n".join(lines)
 
-        output += "\n🧪 Testing API Authentication...\n"
-        try:
-            result = await client.get_devices()
-            if result.get("statusCode") == 100:
-                output += "✅ Authentication successful!\n"
-            else:
-                output += f"❌ Authentication failed: {result.get('message')}\n"
-        except Exception as e:
-            output += f"❌ API request failed: {e}\n"
+        lines += ["", "🧪 Testing API Authentication..."]
+        if client.credentials_recently_verified():
+            lines.append("✅ Authentication successful! (cached)")
+            return "\n".join(lines) + "\n"
 
-        return output
+        # Auth check and AC status probe are independent, so run them together
+        calls = [client.get_devices()]
+        if device_id:
+            calls.append(client.get_device_status(device_id))
+        results = await asyncio.gather(*calls, return_exceptions=True)
+
+        lines.append(describe_result(results[0], "Authentication successful!", "Authentication failed"))
+        if device_id:
+            lines.append(describe_result(results[1], "AC device reachable", "AC device status failed"))
+
+        return "\n".join(lines) + "\n"
 
     @mcp.tool()
     async def get_ac_devices() -> str:
         """List all infrared devices (to find your AC device ID)."""
         require_auth()
         try:
-            result = await client.get_devices()
+            result = client.cached_devices() or await client.get_devices()
             if result.get("statusCode") != 100:
                 return f"Error: {result.get('message', 'Unknown error')}"
 
-            devices = result.get("body", {}).get("infraredRemoteList", [])
-            if not devices:
+            if not result.get("body", {}).get("infraredRemoteList"):
                 return "No infrared devices found. Add your AC remote via the SwitchBot app."
 
-            output = "Infrared Devices:\n\n"
-            for dev in devices:
-                output += f"Name: {dev.get('deviceName', 'Unnamed')}\n"
-                output += f"Type: {dev.get('remoteType', 'Unknown')}\n"
-                output += f"Device ID: {dev.get('deviceId', 'N/A')}\n"
-                output += f"Hub ID: {dev.get('hubDeviceId', 'N/A')}\n"
-                output += "-" * 40 + "\n"
-
-            return output
+            devices = result["body"]["infraredRemoteList"]
+            return "Infrared Devices:\n\n" + "".join(map(format_device, devices))
         except Exception as e:
             return f"Error retrieving devices: {e}"
 
@@ -78,20 +118,4 @@ def register_discovery_tools(mcp: FastMCP, client: SwitchBotClient, device_id: s
     async def list_common_ac_commands() -> str:
         """List common AC commands for send_custom_ac_command."""
         require_auth()
-        return """🎮 Common AC Commands:
-
-Standard:
-  • turnOn / turnOff - Power control
-  • setAll - Set all parameters
-
-Custom (use with send_custom_ac_command):
-  • swing - Toggle vertical swing
-  • swingHorizontal - Toggle horizontal swing
-  • timer - Set timer
-  • sleep - Activate sleep mode
-  • turbo - Activate turbo mode
-  • economy - Energy saving mode
-  • quiet - Silent mode
-  • light - Toggle display light
-
-⚠️ Not all commands work with all AC models."""
+        return COMMON_COMMANDS_TEXT
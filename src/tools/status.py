@@ -2,20 +2,37 @@
 Status Tools
 
 MCP tools for checking AC and room status.
+
+Status tools return readable text plus the same values as structured
+content, so programmatic clients don't need to parse the text.
 """
 
+import asyncio
+
 from fastmcp import FastMCP
+from fastmcp.tools.tool import ToolResult
 from ..switchbot import ACCommands
 from .auth import require_auth
 
 
+def comfort_label(temp: float) -> str:
+    """Describe how a room temperature feels."""
+    if temp < 18:
+        return "❄️ It's quite cold"
+    if temp < 22:
+        return "🌤️ Cool"
+    if temp < 26:
+        return "😊 Comfortable"
+    if temp < 30:
+        return "🔥 Getting warm"
+    return "🥵 Very hot!"
+
+
 def register_status_tools(mcp: FastMCP, ac: ACCommands):
     """Register status tools with the MCP server."""
 
-    @mcp.tool()
-    async def get_ac_status() -> str:
-        """Get current AC status (power, temp, mode, fan)."""
-        require_auth()
+    async def ac_status_result() -> tuple[str, dict]:
+        """Get AC status as (text, data)."""
         try:
             status = await ac.get_status()
             power = "ON" if status.get("power") == "on" else "OFF"
@@ -23,18 +40,23 @@ def register_status_tools(mcp: FastMCP, ac: ACCommands):
             mode = status.get("mode", "N/A")
             fan = status.get("fanSpeed", "N/A")
 
-            return f"Air Conditioner Status:\n\nPower: {power}\nTemperature: {temp}°C\nMode: {mode}\nFan Speed: {fan}"
+            text = f"Air Conditioner Status:\n\nPower: {power}\nTemperature: {temp}°C\nMode: {mode}\nFan Speed: {fan}"
+            data = {
+                "power": power.lower(),
+                "temperature": status.get("temperature"),
+                "mode": status.get("mode"),
+                "fan_speed": status.get("fanSpeed"),
+            }
+            return text, data
         except Exception as e:
-            return f"Error retrieving AC status: {e}"
+            return f"Error retrieving AC status: {e}", {"error": str(e)}
 
-    @mcp.tool()
-    async def get_room_temperature() -> str:
-        """Get room temperature and humidity from Hub 2."""
-        require_auth()
+    async def room_temperature_result() -> tuple[str, dict]:
+        """Get Hub 2 room conditions as (text, data)."""
         try:
             data = await ac.get_hub_temperature()
             if not data:
-                return "⚠️ Hub 2 sensor data not available"
+                return "⚠️ Hub 2 sensor data not available", {"error": "Hub 2 sensor data not available"}
 
             temp = data.get("temperature")
             humidity = data.get("humidity")
@@ -42,17 +64,34 @@ def register_status_tools(mcp: FastMCP, ac: ACCommands):
             output = f"🌡️ Room Conditions (from Hub 2):\n\nTemperature: {temp}°C\nHumidity: {humidity}%"
 
             if temp is not None:
-                if temp < 18:
-                    output += "\n\n❄️ It's quite cold"
-                elif temp < 22:
-                    output += "\n\n🌤️ Cool"
-                elif temp < 26:
-                    output += "\n\n😊 Comfortable"
-                elif temp < 30:
-                    output += "\n\n🔥 Getting warm"
-                else:
-                    output += "\n\n🥵 Very hot!"
-
-            return output
+                output = f"{output}\n\n{comfort_label(temp)}"
+
+            return output, {"temperature": temp, "humidity": humidity}
         except Exception as e:
-            return f"Error getting room temperature: {e}"
+            return f"Error getting room temperature: {e}", {"error": str(e)}
+
+    @mcp.tool()
+    async def get_ac_status() -> ToolResult:
+        """Get current AC status (power, temp, mode, fan)."""
+        require_auth()
+        text, data = await ac_status_result()
+        return ToolResult(content=text, structured_content=data)
+
+    @mcp.tool()
+    async def get_room_temperature() -> ToolResult:
+        """Get room temperature and humidity from Hub 2."""
+        require_auth()
+        text, data = await room_temperature_result()
+        return ToolResult(content=text, structured_content=data)
+
+    @mcp.tool()
+    async def get_ac_and_room_status() -> ToolResult:
+        """Get AC status and room conditions in a single call."""
+        require_auth()
+        (ac_text, ac_data), (room_text, room_data) = await asyncio.gather(
+            ac_status_result(), room_temperature_result()
+        )
+        return ToolResult(
+            content=f"{ac_text}\n\n{'-' * 40}\n\n{room_text}",
+            structured_content={"ac": ac_data, "room": room_data},
+        )
@@ -10,61 +10,82 @@ Usage:
 """
 
 import asyncio
+import base64
+import hmac
+import importlib.util
 import os
+import secrets
 import sys
+import time
 from pathlib import Path
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
 
-try:
+import orjson
+
+if TYPE_CHECKING:
     import httpx
-    import hashlib
-    import hmac
-    import base64
-    import time
-    import uuid
-except ImportError as e:
-    print(f"❌ Error: Missing required module: {e}")
-    print("Please install dependencies: pip install -r requirements.txt")
-    sys.exit(1)
-
-# Try to load .env file if it exists
-try:
-    from dotenv import load_dotenv
-    env_file = Path(__file__).parent / ".env"
-    if env_file.exists():
-        load_dotenv(env_file)
-        print("✅ Loaded credentials from .env file\n")
-    else:
-        print("ℹ️  No .env file found, using environment variables\n")
-except ImportError:
-    print("ℹ️  python-dotenv not installed, using environment variables\n")
 
-# Configuration
-SWITCHBOT_TOKEN = os.getenv("SWITCHBOT_TOKEN", "")
-SWITCHBOT_SECRET = os.getenv("SWITCHBOT_SECRET", "")
-AC_DEVICE_ID = os.getenv("SWITCHBOT_AC_DEVICE_ID", "")
 
 API_BASE = "https://api.switch-bot.com/v1.1"
 
+# remoteType values (lowercased) that identify an air conditioner remote
+_AC_TYPES = frozenset({"air conditioner", "airconditioner", "ac"})
 
-def generate_sign(token: str, secret: str, nonce: str) -> tuple[str, str]:
-    """Generate authentication signature for SwitchBot API."""
-    t = int(round(time.time() * 1000))
-    string_to_sign = f"{token}{t}{nonce}"
-    string_to_sign_bytes = bytes(string_to_sign, "utf-8")
-    secret_bytes = bytes(secret, "utf-8")
-    sign = base64.b64encode(
-        hmac.new(secret_bytes, msg=string_to_sign_bytes, digestmod=hashlib.sha256).digest()
+
+def _load_config() -> SimpleNamespace:
+    """Load credentials from .env / the environment (only when the script runs)."""
+    try:
+        from dotenv import load_dotenv
+        env_file = Path(__file__).parent / ".env"
+        if env_file.exists():
+            load_dotenv(env_file)
+            print("✅ Loaded credentials from .env file\n")
+        else:
+            print("ℹ️  No .env file found, using environment variables\n")
+    except ImportError:
+        print("ℹ️  python-dotenv not installed, using environment variables\n")
+
+    token = os.getenv("SWITCHBOT_TOKEN", "")
+    secret = os.getenv("SWITCHBOT_SECRET", "")
+    return SimpleNamespace(
+        token=token,
+        secret=secret,
+        device_id=os.getenv("SWITCHBOT_AC_DEVICE_ID", ""),
+        # Signing material never changes during a run: encode it once
+        token_bytes=token.encode("utf-8"),
+        secret_bytes=secret.encode("utf-8"),
     )
-    return str(t), str(sign, "utf-8")
 
 
-async def test_authentication():
+def generate_sign(config: SimpleNamespace, nonce: str) -> tuple[str, str]:
+    """Generate authentication signature for SwitchBot API."""
+    t = str(time.time_ns() // 1_000_000)
+    # One-shot HMAC runs entirely in OpenSSL, no Python HMAC object
+    digest = hmac.digest(config.secret_bytes, config.token_bytes + t.encode("utf-8") + nonce.encode("utf-8"), "sha256")
+    return t, base64.b64encode(digest).decode("utf-8")
+
+
+def _auth_headers(config: SimpleNamespace) -> dict[str, str]:
+    """Per-request signing headers (Authorization is set on the client)."""
+    nonce = secrets.token_hex(16)
+    t, sign = generate_sign(config, nonce)
+    return {"sign": sign, "nonce": nonce, "t": t}
+
+
+async def _get_json(client: "httpx.AsyncClient", config: SimpleNamespace, path: str) -> dict:
+    """Signed GET, returning the decoded response body."""
+    response = await client.get(path, headers=_auth_headers(config))
+    return orjson.loads(response.content)
+
+
+async def test_authentication(client: "httpx.AsyncClient", config: SimpleNamespace):
     """Test if API credentials are valid."""
     print("=" * 70)
     print("Testing SwitchBot API Authentication...")
     print("=" * 70)
     
-    if not SWITCHBOT_TOKEN or not SWITCHBOT_SECRET:
+    if not config.token or not config.secret:
         print("❌ ERROR: SWITCHBOT_TOKEN and SWITCHBOT_SECRET must be set!")
         print("\nOption 1: Create a .env file with:")
         print("  SWITCHBOT_TOKEN=your_token_here")
@@ -74,158 +95,156 @@ async def test_authentication():
         print("  Linux/Mac: export SWITCHBOT_TOKEN='your_token'")
         return False
     
-    nonce = uuid.uuid4().hex
-    t, sign = generate_sign(SWITCHBOT_TOKEN, SWITCHBOT_SECRET, nonce)
-    
-    headers = {
-        "Authorization": SWITCHBOT_TOKEN,
-        "sign": sign,
-        "nonce": nonce,
-        "t": t,
-        "Content-Type": "application/json"
-    }
-    
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(f"{API_BASE}/devices", headers=headers)
-            result = response.json()
-            
-            if result.get("statusCode") == 100:
-                print("✅ Authentication successful!")
-                return True
-            else:
-                print(f"❌ Authentication failed: {result.get('message', 'Unknown error')}")
-                return False
+        result = await _get_json(client, config, "/devices")
+        
+        if result.get("statusCode") == 100:
+            print("✅ Authentication successful!")
+            return True
+        else:
+            print(f"❌ Authentication failed: {result.get('message', 'Unknown error')}")
+            return False
     except Exception as e:
         print(f"❌ Error connecting to SwitchBot API: {e}")
         return False
 
 
-async def list_devices():
-    """List all available devices."""
-    print("\n" + "=" * 70)
-    print("Listing Available Devices...")
-    print("=" * 70)
+def section_header(title: str) -> str:
+    """Section banner text."""
+    return f"\n{'=' * 70}\n{title}\n{'=' * 70}"
+
+
+def _device_report(body: dict, ac_device_id: str) -> list[str]:
+    """Output lines describing the physical and infrared devices."""
+    physical_devices = body.get("deviceList", [])
+    infrared_devices = body.get("infraredRemoteList", [])
     
-    nonce = uuid.uuid4().hex
-    t, sign = generate_sign(SWITCHBOT_TOKEN, SWITCHBOT_SECRET, nonce)
+    out = [f"\n📱 Physical Devices: {len(physical_devices)}"]
+    for device in physical_devices:
+        out.append(f"  - {device.get('deviceName')} ({device.get('deviceType')})")
+        out.append(f"    ID: {device.get('deviceId')}")
     
-    headers = {
-        "Authorization": SWITCHBOT_TOKEN,
-        "sign": sign,
-        "nonce": nonce,
-        "t": t,
-        "Content-Type": "application/json"
-    }
+    out.append(f"\n🎮 Infrared Remote Devices: {len(infrared_devices)}")
+    ac_found = False
+    for i, device in enumerate(infrared_devices, 1):
+        device_type = device.get("remoteType", "Unknown")
+        device_name = device.get("deviceName", "Unnamed")
+        device_id = device.get("deviceId", "N/A")
+        
+        out.append(f"  - {device_name} ({device_type})")
+        out.append(f"    Device ID: {device_id}")
+        out.append(f"    Hub ID: {device.get('hubDeviceId', 'N/A')}")
+        
+        if device_id == ac_device_id:
+            ac_found = True
+            out.append("    ✅ This is your configured AC!")
+            out.append("")
+            # Nothing left to find; don't list the remaining remotes
+            if i < len(infrared_devices):
+                out.append(f"  ({len(infrared_devices) - i} more remotes not shown)")
+            break
+
+        if device_type.lower() in _AC_TYPES:
+            ac_found = True
+            out.append(f"    💡 You can use this ID: {device_id}")
+        out.append("")
     
+    if not ac_found:
+        out.append("\n⚠️  No air conditioner remote found!")
+        out.append("    Please add your AC remote to SwitchBot Hub 2 via the app.")
+    return out
+
+
+async def list_devices(client: "httpx.AsyncClient", config: SimpleNamespace) -> list[str]:
+    """List all available devices (returns the section's output lines)."""
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(f"{API_BASE}/devices", headers=headers)
-            result = response.json()
-            
-            if result.get("statusCode") != 100:
-                print(f"❌ Error: {result.get('message', 'Unknown error')}")
-                return
-            
-            body = result.get("body", {})
-            physical_devices = body.get("deviceList", [])
-            infrared_devices = body.get("infraredRemoteList", [])
-            
-            print(f"\n📱 Physical Devices: {len(physical_devices)}")
-            for device in physical_devices:
-                print(f"  - {device.get('deviceName')} ({device.get('deviceType')})")
-                print(f"    ID: {device.get('deviceId')}")
-            
-            print(f"\n🎮 Infrared Remote Devices: {len(infrared_devices)}")
-            ac_found = False
-            for device in infrared_devices:
-                device_type = device.get("remoteType", "Unknown")
-                device_name = device.get("deviceName", "Unnamed")
-                device_id = device.get("deviceId", "N/A")
-                
-                print(f"  - {device_name} ({device_type})")
-                print(f"    Device ID: {device_id}")
-                print(f"    Hub ID: {device.get('hubDeviceId', 'N/A')}")
-                
-                if device_type.lower() in ["air conditioner", "airconditioner", "ac"]:
-                    ac_found = True
-                    if device_id == AC_DEVICE_ID:
-                        print("    ✅ This is your configured AC!")
-                    else:
-                        print(f"    💡 You can use this ID: {device_id}")
-                print()
-            
-            if not ac_found:
-                print("\n⚠️  No air conditioner remote found!")
-                print("    Please add your AC remote to SwitchBot Hub 2 via the app.")
-            
+        result = await _get_json(client, config, "/devices")
     except Exception as e:
-        print(f"❌ Error: {e}")
+        result = e
 
+    out = [section_header("Listing Available Devices...")]
+    if isinstance(result, Exception):
+        out.append(f"❌ Error: {result}")
+    elif result.get("statusCode") != 100:
+        out.append(f"❌ Error: {result.get('message', 'Unknown error')}")
+    else:
+        out += _device_report(result.get("body", {}), config.device_id)
+    return out
 
-async def test_ac_status():
-    """Test AC status retrieval if device ID is configured."""
-    print("\n" + "=" * 70)
-    print("Testing AC Status Retrieval...")
-    print("=" * 70)
-    
-    if not AC_DEVICE_ID:
-        print("⚠️  SWITCHBOT_AC_DEVICE_ID not set. Skipping status test.")
-        print("   Add it to your .env file after finding your device ID above.")
-        return
-    
-    nonce = uuid.uuid4().hex
-    t, sign = generate_sign(SWITCHBOT_TOKEN, SWITCHBOT_SECRET, nonce)
-    
-    headers = {
-        "Authorization": SWITCHBOT_TOKEN,
-        "sign": sign,
-        "nonce": nonce,
-        "t": t,
-        "Content-Type": "application/json"
-    }
+
+async def test_ac_status(client: "httpx.AsyncClient", config: SimpleNamespace) -> list[str]:
+    """Test AC status retrieval if device ID is configured (returns output lines)."""
+    out = [section_header("Testing AC Status Retrieval...")]
+    if not config.device_id:
+        out.append("⚠️  SWITCHBOT_AC_DEVICE_ID not set. Skipping status test.")
+        out.append("   Add it to your .env file after finding your device ID above.")
+        return out
     
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                f"{API_BASE}/devices/{AC_DEVICE_ID}/status",
-                headers=headers
-            )
-            result = response.json()
-            
-            if result.get("statusCode") == 100:
-                print("✅ Successfully retrieved AC status!")
-                body = result.get("body", {})
-                print(f"\n📊 Current Status:")
-                print(f"   Power: {'ON' if body.get('power') == 'on' else 'OFF'}")
-                print(f"   Temperature: {body.get('temperature', 'N/A')}°C")
-                print(f"   Mode: {body.get('mode', 'N/A')}")
-                print(f"   Fan Speed: {body.get('fanSpeed', 'N/A')}")
-            else:
-                print(f"⚠️  Status not available: {result.get('message', 'Unknown error')}")
-                print(f"   This is normal for IR remotes without state feedback.")
-                print(f"   Commands will still work!")
-    
+        result = await _get_json(client, config, f"/devices/{config.device_id}/status")
     except Exception as e:
-        print(f"❌ Error: {e}")
+        result = e
+
+    if isinstance(result, Exception):
+        out.append(f"❌ Error: {result}")
+    elif result.get("statusCode") == 100:
+        body = result.get("body", {})
+        out += [
+            "✅ Successfully retrieved AC status!",
+            "\n📊 Current Status:",
+            f"   Power: {'ON' if body.get('power') == 'on' else 'OFF'}",
+            f"   Temperature: {body.get('temperature', 'N/A')}°C",
+            f"   Mode: {body.get('mode', 'N/A')}",
+            f"   Fan Speed: {body.get('fanSpeed', 'N/A')}",
+        ]
+    else:
+        out += [
+            f"⚠️  Status not available: {result.get('message', 'Unknown error')}",
+            "   This is normal for IR remotes without state feedback.",
+            "   Commands will still work!",
+        ]
+    return out
 
 
 async def main():
     """Run all tests."""
+    try:
+        import httpx
+        if importlib.util.find_spec("h2") is None:  # Needed for http2=True
+            raise ImportError("No module named 'h2'")
+    except ImportError as e:
+        print(f"❌ Error: Missing required module: {e}")
+        print("Please install dependencies: pip install -r requirements.txt")
+        sys.exit(1)
+
+    config = _load_config()
+
     print("\n🧪 SwitchBot AC MCP Server - Connection Test")
     print("=" * 70)
     
-    # Test 1: Authentication
-    auth_ok = await test_authentication()
-    if not auth_ok:
-        print("\n❌ Authentication failed. Please check your credentials.")
-        sys.exit(1)
-    
-    # Test 2: List devices
-    await list_devices()
-    
-    # Test 3: Test AC status (if configured)
-    await test_ac_status()
+    # One pooled HTTP/2 client, so concurrent probes share a single connection
+    async with httpx.AsyncClient(
+        base_url=API_BASE,
+        http2=True,
+        timeout=30.0,
+        headers={"Authorization": config.token, "Content-Type": "application/json"},
+        limits=httpx.Limits(max_keepalive_connections=4, max_connections=4),
+    ) as client:
+        # Test 1: Authentication
+        auth_ok = await test_authentication(client, config)
+        if not auth_ok:
+            print("\n❌ Authentication failed. Please check your credentials.")
+            sys.exit(1)
+
+        # Tests 2 and 3: list devices and AC status (independent, so run together)
+        sections = await asyncio.gather(
+            list_devices(client, config), test_ac_status(client, config), return_exceptions=True
+        )
+        # Print in a fixed order once both are done, so the output reads the same every run
+        for section in sections:
+            if isinstance(section, Exception):
+                section = [f"❌ Error: {section}"]
+            sys.stdout.write("\n".join(section) + "\n")
     
     print("\n" + "=" * 70)
     print("✅ Connection Test Complete!")